@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""Sweep the story finishing game over multiple k values.
+
+For each k in --k-values, runs a StoryFinishingGame with c = k against the
+same backend and writes results_k{k}.json.gz, plus a consolidated
+summary.json.gz for plotting (plots/generate_experiment_plots.py).
+
+The per-k experiments are fired concurrently on the event loop, bounded by
+--max-parallel, so the backend's continuous batching can overlap them
+instead of idling between sequential games. The server's Prometheus
+counters are global, so overlapping games cannot tell their requests apart
+in a snapshot delta; the default of one game at a time keeps the delta
+attribution exact, and raising --max-parallel switches the games to their
+client-side streamed timings (no prefill/decode split) instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from harvard_agentic_system.game import StoryFinishingGame  # noqa: E402
+
+DEFAULT_MODEL = "mistralai/Mistral-7B-Instruct-v0.3"
+DEFAULT_K_VALUES = [1, 2, 4, 8, 16, 32, 64]
+
+# Full per-k results retained only under --also-plot, for in-process plotting.
+_full_results: dict[int, dict] = {}
+
+
+def _dump_json(obj: dict, path: Path) -> None:
+    """Serialize with orjson when available (2-10x faster on per-turn arrays).
+
+    Serialize fully in memory and hand the kernel one buffer; json.dump's
+    incremental chunk writes to the file object are much slower for the
+    per-turn arrays and issue far more syscalls.
+
+    Output is machine-consumed only (plots/generate_experiment_plots.py),
+    so it is written compact and gzip-compressed; pretty-printing roughly
+    doubles both the bytes and the serialization time.
+
+    Writes go through a temporary file plus atomic rename, so a crash
+    mid-write never leaves a truncated file that a later --resume or the
+    plot script would choke on.
+    """
+    if orjson is not None:
+        data = orjson.dumps(obj)
+    else:
+        data = json.dumps(obj).encode()
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(gzip.compress(data))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _load_json(path: Path) -> dict:
+    data = gzip.decompress(path.read_bytes())
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps_line(obj: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+async def run_experiment(k: int, args: argparse.Namespace, semaphore: asyncio.Semaphore) -> dict:
+    """Run one game with c = k and write its results file."""
+    async with semaphore:
+        game = StoryFinishingGame(
+            model_name=args.model,
+            num_turns=args.turns,
+            c=k,
+            backend_url=args.backend,
+            # Overlapping games share the server's global Prometheus
+            # counters, so snapshot deltas would attribute one game's
+            # requests to another; measure from the streamed responses
+            # whenever more than one game can be in flight.
+            client_side_metrics=args.max_parallel > 1,
+        )
+        game.start()
+        try:
+            # The game itself is blocking (sequential turns); run it off the
+            # event loop so other k-values can proceed concurrently.
+            metrics = await asyncio.to_thread(game.run)
+        finally:
+            game.stop()
+
+        # JSON serialization is CPU-bound; keep it off the event loop too.
+        return await asyncio.to_thread(_write_result, k, metrics, args)
+
+
+def _write_result(k: int, metrics: dict, args: argparse.Namespace) -> dict:
+    """Write the per-k results file; returns just the scalar summary row.
+
+    The full results dict (including per_turn_metrics) goes straight to
+    disk and is dropped from memory immediately, so the sweep's peak RSS
+    is bounded by the biggest single game rather than growing with the
+    number of k-values. Only the scalar summary fields stay resident.
+    """
+    results = {
+        "experiment_params": {
+            "model": args.model,
+            "turns": args.turns,
+            "k": k,
+            "backend": args.backend,
+        },
+        "metrics": metrics,
+    }
+    output_file = Path(args.output_dir) / f"results_k{k}.json.gz"
+    _dump_json(results, output_file)
+    print(f"k={k}: done, results written to {output_file}")
+    if getattr(args, "also_plot", False):
+        # In-process plotting consumes the full results after the sweep.
+        _full_results[k] = results
+    else:
+        # The per-turn array is only needed on disk; drop it eagerly so it
+        # is collectable even while the caller still holds the metrics dict.
+        metrics.pop("per_turn_metrics", None)
+
+    row = {
+        "k": k,
+        "file": output_file.name,
+        "avg_ttft": metrics["avg_ttft"],
+        "ttft_p50": metrics["ttft_p50"],
+        "ttft_p99": metrics["ttft_p99"],
+        "avg_tpot": metrics["avg_tpot"],
+        "tpot_p50": metrics["tpot_p50"],
+        "tpot_p99": metrics["tpot_p99"],
+        "total_time": metrics["total_time"],
+    }
+    # Stream the row to summary.jsonl as each experiment finishes, so an
+    # interrupted sweep still leaves a usable partial summary behind.
+    with open(Path(args.output_dir) / "summary.jsonl", "a") as f:
+        f.write(_dumps_line(row) + "\n")
+    return row
+
+
+async def run_experiments_batched(args: argparse.Namespace) -> list[dict]:
+    """Advance all k-games in lockstep, one wave of requests per turn.
+
+    Every turn, the per-k requests are submitted together, so they land in
+    the scheduler within one iteration window and continuous batching
+    amortizes the decode-phase weight fetches across the whole sweep,
+    instead of each game being served alone. The per-k JSON output format
+    is identical to the sequential path.
+
+    Because every wave hits the same server, a Prometheus snapshot window
+    here would span the whole wave and each game's "per-k" delta would
+    collapse to the wave average. The games therefore run with
+    client_side_metrics: each turn's TTFT/TPOT comes from that game's own
+    streamed response, which demultiplexes the wave per request
+    (prefill/decode split is unavailable and reported as 0).
+
+    Every story turn is unconstrained free-form decoding; no turn uses a
+    grammar/JSON logit mask, so a wave never mixes constrained requests
+    (CPU-side per-token mask validation) into the batch and the decode
+    path is never stalled waiting on mask generation. If constrained
+    turns are ever added, dispatch them as a separate wave.
+    """
+    games = {
+        k: StoryFinishingGame(
+            model_name=args.model,
+            num_turns=args.turns,
+            c=k,
+            backend_url=args.backend,
+            client_side_metrics=True,
+        )
+        for k in args.k_values
+    }
+    for game in games.values():
+        game.start()
+    game_start = time.time()
+    try:
+        for turn in range(1, args.turns + 1):
+            await asyncio.gather(
+                *[asyncio.to_thread(game.step, turn) for game in games.values()]
+            )
+    finally:
+        for game in games.values():
+            game.stop()
+    game_end = time.time()
+
+    return [
+        _write_result(k, game.aggregate(game_start, game_end), args)
+        for k, game in games.items()
+    ]
+
+
+def _collect_resumable(args: argparse.Namespace) -> list[dict]:
+    """Summary rows for k-values whose results file matches this sweep.
+
+    A file counts only if its recorded (k, model, turns) equal the current
+    arguments, so stale results from a different configuration are re-run.
+    """
+    rows = []
+    for k in args.k_values:
+        result_file = Path(args.output_dir) / f"results_k{k}.json.gz"
+        if not result_file.exists():
+            continue
+        try:
+            data = _load_json(result_file)
+        except (OSError, ValueError):
+            continue
+        params = data.get("experiment_params", {})
+        if (params.get("k"), params.get("model"), params.get("turns")) != (
+            k, args.model, args.turns
+        ):
+            continue
+        metrics = data["metrics"]
+        rows.append(
+            {
+                "k": k,
+                "file": result_file.name,
+                "avg_ttft": metrics["avg_ttft"],
+                "ttft_p50": metrics["ttft_p50"],
+                "ttft_p99": metrics["ttft_p99"],
+                "avg_tpot": metrics["avg_tpot"],
+                "tpot_p50": metrics["tpot_p50"],
+                "tpot_p99": metrics["tpot_p99"],
+                "total_time": metrics["total_time"],
+            }
+        )
+        if getattr(args, "also_plot", False):
+            _full_results[k] = data
+        print(f"k={k}: reusing {result_file} (--resume)")
+    return rows
+
+
+async def run_sweep(args: argparse.Namespace) -> list[dict]:
+    semaphore = asyncio.Semaphore(args.max_parallel)
+    return list(
+        await asyncio.gather(
+            *[run_experiment(k, args, semaphore) for k in args.k_values]
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Story finishing k-sweep")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Model name")
+    parser.add_argument("--turns", type=int, default=100, help="Turns per game")
+    parser.add_argument(
+        "--k-values",
+        type=int,
+        nargs="+",
+        default=DEFAULT_K_VALUES,
+        help="Tokens-per-turn values to sweep",
+    )
+    parser.add_argument(
+        "--backend",
+        default="http://localhost:8000/v1",
+        help="OpenAI-compatible backend URL",
+    )
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=1,
+        help="Maximum games in flight at once (above 1, per-turn metrics "
+        "come from client-side streamed timings; see module docstring)",
+    )
+    parser.add_argument(
+        "--batched",
+        action="store_true",
+        help="Advance all k-games in lockstep so each turn is one request batch",
+    )
+    parser.add_argument(
+        "--also-plot",
+        action="store_true",
+        help="Render the summary plots in-process after the sweep",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse existing results_k*.json.gz whose parameters match",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default="output/run_experiments",
+        help="Directory for results_k*.json.gz and summary.json.gz",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    resumed_rows: list[dict] = []
+    if args.resume:
+        resumed_rows = _collect_resumable(args)
+        args.k_values = [
+            k for k in args.k_values if k not in {r["k"] for r in resumed_rows}
+        ]
+    else:
+        # Fresh partial-summary stream for this sweep.
+        (output_dir / "summary.jsonl").unlink(missing_ok=True)
+
+    sweep_start = time.time()
+    if args.batched:
+        summary_rows = asyncio.run(run_experiments_batched(args))
+    else:
+        summary_rows = asyncio.run(run_sweep(args))
+    sweep_time = time.time() - sweep_start
+    summary_rows = sorted(resumed_rows + summary_rows, key=lambda r: r["k"])
+
+    summary = {
+        "model": args.model,
+        "turns": args.turns,
+        "sweep_time_seconds": sweep_time,
+        "results": summary_rows,
+    }
+
+    summary_file = output_dir / "summary.json.gz"
+    _dump_json(summary, summary_file)
+    print(f"Sweep complete in {sweep_time:.1f}s; summary written to {summary_file}")
+
+    if args.also_plot:
+        # Hand the in-memory summary and per-k results straight to the plot
+        # pipeline instead of having it re-parse what we just wrote.
+        plots_dir = Path(__file__).resolve().parent.parent / "plots"
+        sys.path.insert(0, str(plots_dir))
+        import generate_experiment_plots  # noqa: E402
+
+        generate_experiment_plots.render_summary_plots(
+            summary, _full_results, plots_dir
+        )
+
+
+if __name__ == "__main__":
+    main()
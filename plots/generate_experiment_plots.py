@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""Generate SOSP-style plots for the story finishing k-sweep results.
+
+Reads summary.json and results_k*.json produced by
+experiments/run_experiments.py and creates:
+1. TTFT vs turn — one figure per k
+2. TPOT vs turn — one figure per k (k > 1 only)
+3. k vs TTFT — average/p50/p99
+4. k vs TPOT — average/p50/p99
+"""
+
+import argparse
+import functools
+import gzip
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict
+
+import matplotlib  # type: ignore
+
+# Headless backend before pyplot import: worker processes must not try to
+# open a GUI, and Agg renders fastest for file output anyway.
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # type: ignore  # noqa: E402
+import numpy as np  # type: ignore  # noqa: E402
+from matplotlib.collections import LineCollection  # type: ignore  # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# SOSP style configuration (matches generate_plots.py). Mathtext with the
+# STIX fontset keeps the serif/LaTeX look without forking latex+dvipng on
+# every savefig; pass --publication for the real-LaTeX final render.
+SOSP_STYLE = {
+    "figure.figsize": (8, 5),
+    "font.size": 16,
+    "font.family": "serif",
+    "text.usetex": False,
+    "mathtext.fontset": "stix",
+    "axes.labelsize": 16,
+    "axes.titlesize": 16,
+    "xtick.labelsize": 16,
+    "ytick.labelsize": 16,
+    "legend.fontsize": 14,
+    "legend.frameon": False,
+    "lines.linewidth": 2.0,
+    "lines.markersize": 6,
+    "axes.linewidth": 1.0,
+    "xtick.major.width": 1.0,
+    "ytick.major.width": 1.0,
+    "xtick.major.size": 4,
+    "ytick.major.size": 4,
+    "savefig.dpi": 300,
+    "savefig.bbox": "tight",
+    "savefig.pad_inches": 0.1,
+}
+
+# Apply the style once at import; per-plot re-application re-parses the
+# stylesheet and invalidates font caches for no benefit.
+plt.style.use("default")
+plt.rcParams.update(SOSP_STYLE)
+
+
+# One Figure reused for every per-turn plot: ax.clear() between k-values is
+# much cheaper than paying plt.subplots (backend + font setup) per figure.
+# Creating it here also materializes the FontManager once, before any
+# worker forks off.
+# Constrained layout solves placement during the real draw, replacing the
+# extra tight_layout() measuring pass each per-turn plot used to pay.
+_FIG, _AX = plt.subplots(figsize=SOSP_STYLE["figure.figsize"], layout="constrained")
+
+# Frozen (stat key, marker, color, legend label) specs for the vs-k series.
+_VS_K_SERIES = [
+    ("avg", "o", "C0", "Average"),
+    ("p50", "s", "C1", "Median (p50)"),
+    ("p99", "^", "C2", "p99"),
+]
+
+# Precomputed margins for the single-axes vs-k figures; savefig already
+# crops with bbox_inches="tight", so a per-figure tight_layout solve adds
+# nothing but time.
+_VS_K_MARGINS = {"left": 0.12, "right": 0.97, "top": 0.95, "bottom": 0.13}
+
+
+def _load_json(path: Path) -> Dict[str, Any]:
+    """Parse with orjson when available (2-5x faster on per-turn arrays).
+
+    Handles both the gzip-compressed files the sweep writes now and the
+    plain .json files from older runs.
+    """
+    if path.suffix == ".gz":
+        data = gzip.decompress(path.read_bytes())
+    else:
+        data = path.read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_summary(summary_path: Path) -> Dict[str, Any]:
+    """Load the sweep summary written by run_experiments.py."""
+    return _load_json(summary_path)
+
+
+@functools.lru_cache(maxsize=None)
+def load_result(result_path: str) -> Dict[str, Any]:
+    """Load one per-k results file (includes per_turn_metrics).
+
+    Cached so the TTFT and TPOT plots for the same k share one parse. The
+    argument is a string rather than a Path purely for hashability.
+    """
+    return _load_json(Path(result_path))
+
+
+def _extract_per_turn(result: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Turn per_turn_metrics into numpy columns, computed once per result."""
+    per_turn = result["metrics"]["per_turn_metrics"]
+    n = len(per_turn)
+    return {
+        "turns": np.fromiter((m["turn"] for m in per_turn), dtype=np.float64, count=n),
+        "ttft": np.fromiter((m["ttft"] for m in per_turn), dtype=np.float64, count=n),
+        "tpot": np.fromiter((m["tpot"] for m in per_turn), dtype=np.float64, count=n),
+    }
+
+
+def plot_ttft_vs_turn(result: Dict[str, Any], k: int, output_dir: Path) -> None:
+    """TTFT per turn for one k."""
+    columns = _extract_per_turn(result)
+    turns = columns["turns"]
+    ttft = columns["ttft"] * 1000.0
+
+    ax = _AX
+    ax.clear()
+    # Rasterize the line content: thousands of turn-points as vector PDF
+    # segments dwarf the 300 dpi raster in both size and render time.
+    (line,) = ax.plot(turns, ttft, marker="o", linewidth=2, markersize=6, color="b")
+    line.set_rasterized(True)
+    ax.set_xlabel("Turn")
+    ax.set_ylabel("TTFT (ms)")
+    ax.set_title(f"TTFT per turn (k={k})")
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.set_axisbelow(True)
+
+    # The PDF embeds the rasterized content, so the separate PNG render
+    # would be a second full draw for the same pixels.
+    _FIG.savefig(output_dir / f"ttft_vs_turn_k{k}.pdf", dpi=300, bbox_inches="tight", format="pdf")
+    print(f"Saved TTFT vs turn for k={k}")
+
+
+def plot_tpot_vs_turn(result: Dict[str, Any], k: int, output_dir: Path) -> None:
+    """TPOT per turn for one k."""
+    columns = _extract_per_turn(result)
+    turns = columns["turns"]
+    tpot = columns["tpot"] * 1000.0
+
+    ax = _AX
+    ax.clear()
+    (line,) = ax.plot(turns, tpot, marker="o", linewidth=2, markersize=6, color="g")
+    line.set_rasterized(True)
+    ax.set_xlabel("Turn")
+    ax.set_ylabel("TPOT (ms)")
+    ax.set_title(f"TPOT per turn (k={k})")
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.set_axisbelow(True)
+
+    _FIG.savefig(output_dir / f"tpot_vs_turn_k{k}.pdf", dpi=300, bbox_inches="tight", format="pdf")
+    print(f"Saved TPOT vs turn for k={k}")
+
+
+def plot_turn_grid(
+    results_by_k: Dict[int, Dict[str, Any]],
+    metric: str,
+    ylabel: str,
+    color: str,
+    output_name: str,
+    output_dir: Path,
+) -> None:
+    """All k-values as subplots in one figure: one render, one file pair.
+
+    Replaces the 2 x K separate per-turn files as the default output; the
+    per-k files are still available behind --per-k.
+    """
+    k_values = sorted(results_by_k)
+    ncols = min(4, len(k_values))
+    nrows = -(-len(k_values) // ncols)
+    fig, axes = plt.subplots(
+        nrows, ncols, figsize=(4 * ncols, 3.2 * nrows), sharex=True, sharey=True,
+        squeeze=False, layout="constrained",
+    )
+    for ax, k in zip(axes.flat, k_values):
+        columns = _extract_per_turn(results_by_k[k])
+        (line,) = ax.plot(
+            columns["turns"], columns[metric] * 1000.0,
+            marker="o", linewidth=2, markersize=4, color=color,
+        )
+        line.set_rasterized(True)
+        ax.set_title(f"k={k}")
+        ax.spines["top"].set_visible(False)
+        ax.spines["right"].set_visible(False)
+        ax.set_axisbelow(True)
+    for ax in axes.flat[len(k_values):]:
+        ax.set_visible(False)
+    for ax in axes[-1, :]:
+        ax.set_xlabel("Turn")
+    for ax in axes[:, 0]:
+        ax.set_ylabel(ylabel)
+
+    fig.savefig(output_dir / f"{output_name}.pdf", dpi=300, bbox_inches="tight", format="pdf")
+    fig.savefig(output_dir / f"{output_name}.png", dpi=300, bbox_inches="tight", format="png")
+    print(f"Saved {output_name}")
+    plt.close(fig)
+
+
+def _per_k_stats(
+    results_by_k: Dict[int, Dict[str, Any]], metric: str
+) -> "tuple[list[int], Dict[str, np.ndarray]]":
+    """Average/p50/p99 per k from the raw per-turn samples (in ms).
+
+    Percentiles are computed here from the samples rather than read from
+    the precomputed summary fields, so rolling windows or confidence
+    intervals can be added later without re-running experiments. Every
+    turn counts: the game warms the server up in start(), before the
+    measured window, so turn 1 is steady state like the rest — matching
+    the game's own aggregation.
+    """
+    k_values = sorted(results_by_k)
+    if not k_values:
+        # No samples at all (e.g. a --k-values 1 sweep leaves the tpot
+        # plot with nothing after its k > 1 filter); hand back empty
+        # arrays instead of letting the ragged branch transpose [].
+        empty = np.empty(0, dtype=np.float64)
+        return k_values, {"avg": empty, "p50": empty, "p99": empty}
+    per_k_samples = []
+    for k in k_values:
+        columns = _extract_per_turn(results_by_k[k])
+        per_k_samples.append(columns[metric] * 1000.0)
+
+    lengths = {s.size for s in per_k_samples}
+    if len(lengths) == 1:
+        # All games in a sweep play the same number of turns, so stack into
+        # one matrix and compute every k's stats in single numpy calls.
+        matrix = np.vstack(per_k_samples)
+        p50, p99 = np.percentile(matrix, [50, 99], axis=1, method="lower")
+        avg = matrix.mean(axis=1)
+    else:
+        # Ragged (e.g. mixed sweeps on disk): per-row fallback.
+        p50, p99 = np.transpose(
+            [np.percentile(s, [50, 99], method="lower") for s in per_k_samples]
+        )
+        avg = np.array([s.mean() for s in per_k_samples])
+    return k_values, {"avg": avg, "p50": p50, "p99": p99}
+
+
+def _draw_vs_k_series(ax, k_values: "list[int]", stats: Dict[str, np.ndarray]) -> None:
+    """Draw avg/p50/p99 as one LineCollection plus per-series markers.
+
+    A single collection is one artist and one draw traversal instead of
+    three fully-styled Line2D objects; the scatters carry the markers and
+    the legend entries.
+    """
+    segments = [np.column_stack([k_values, stats[key]]) for key, _, _, _ in _VS_K_SERIES]
+    colors = [color for _, _, color, _ in _VS_K_SERIES]
+    ax.add_collection(LineCollection(segments, colors=colors, linewidths=2))
+    for key, marker, color, label in _VS_K_SERIES:
+        ax.scatter(k_values, stats[key], marker=marker, s=36, color=color, label=label)
+    ax.autoscale_view()
+
+
+def plot_ttft_vs_k(results_by_k: Dict[int, Dict[str, Any]], output_dir: Path) -> None:
+    """Average/p50/p99 TTFT as a function of k."""
+    k_values, stats = _per_k_stats(results_by_k, "ttft")
+    if not k_values:
+        print("Skipping TTFT vs k (no results)")
+        return
+
+    fig, ax = plt.subplots(figsize=SOSP_STYLE["figure.figsize"])
+    _draw_vs_k_series(ax, k_values, stats)
+    ax.set_xlabel("Tokens per turn (k)")
+    ax.set_ylabel("TTFT (ms)")
+    ax.legend(loc="best", frameon=False)
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.set_axisbelow(True)
+
+    fig.subplots_adjust(**_VS_K_MARGINS)
+    fig.savefig(output_dir / "ttft_vs_k.pdf", dpi=300, bbox_inches="tight", format="pdf")
+    fig.savefig(output_dir / "ttft_vs_k.png", dpi=300, bbox_inches="tight", format="png")
+    print("Saved TTFT vs k")
+    plt.close(fig)
+
+
+def plot_tpot_vs_k(results_by_k: Dict[int, Dict[str, Any]], output_dir: Path) -> None:
+    """Average/p50/p99 TPOT as a function of k (k > 1; TPOT needs 2+ tokens)."""
+    k_values, stats = _per_k_stats(
+        {k: r for k, r in results_by_k.items() if k > 1}, "tpot"
+    )
+    if not k_values:
+        print("Skipping TPOT vs k (no k > 1 results)")
+        return
+
+    fig, ax = plt.subplots(figsize=SOSP_STYLE["figure.figsize"])
+    _draw_vs_k_series(ax, k_values, stats)
+    ax.set_xlabel("Tokens per turn (k)")
+    ax.set_ylabel("TPOT (ms)")
+    ax.legend(loc="best", frameon=False)
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.set_axisbelow(True)
+
+    fig.subplots_adjust(**_VS_K_MARGINS)
+    fig.savefig(output_dir / "tpot_vs_k.pdf", dpi=300, bbox_inches="tight", format="pdf")
+    fig.savefig(output_dir / "tpot_vs_k.png", dpi=300, bbox_inches="tight", format="png")
+    print("Saved TPOT vs k")
+    plt.close(fig)
+
+
+def render_summary_plots(
+    summary: Dict[str, Any], results_by_k: Dict[int, Dict[str, Any]], plots_dir: Path
+) -> None:
+    """Render the faceted per-turn grids and the vs-k figures.
+
+    Callable with in-memory dicts so run_experiments.py --also-plot can
+    skip the summary/results round-trip through disk.
+    """
+    plot_turn_grid(results_by_k, "ttft", "TTFT (ms)", "b", "ttft_vs_turn_all", plots_dir)
+    tpot_by_k = {k: r for k, r in results_by_k.items() if k > 1}
+    if tpot_by_k:
+        plot_turn_grid(tpot_by_k, "tpot", "TPOT (ms)", "g", "tpot_vs_turn_all", plots_dir)
+
+    plot_ttft_vs_k(results_by_k, plots_dir)
+    plot_tpot_vs_k(results_by_k, plots_dir)
+
+
+def _render_one(k: int, result_file: str, output_dir: Path) -> None:
+    """Render both per-turn figures for one k (process-pool entry point)."""
+    result = load_result(result_file)
+    plot_ttft_vs_turn(result, k, output_dir)
+    if k > 1:
+        plot_tpot_vs_turn(result, k, output_dir)
+
+
+def _enable_usetex() -> None:
+    """Switch to real LaTeX rendering (slow; paper-ready pass only)."""
+    SOSP_STYLE["text.usetex"] = True
+    plt.rcParams["text.usetex"] = True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Plot story finishing k-sweep results")
+    parser.add_argument(
+        "--publication",
+        action="store_true",
+        help="Render text with real LaTeX instead of mathtext (final pass)",
+    )
+    parser.add_argument(
+        "--per-k",
+        action="store_true",
+        help="Also write the individual per-k TTFT/TPOT figures",
+    )
+    args = parser.parse_args()
+    if args.publication:
+        _enable_usetex()
+
+    script_dir = Path(__file__).resolve().parent
+    project_root = script_dir.parent
+    input_dir = project_root / "output" / "run_experiments"
+    plots_dir = script_dir
+
+    summary_file = input_dir / "summary.json.gz"
+    if not summary_file.exists():
+        # Fall back to the uncompressed name from older sweeps.
+        summary_file = input_dir / "summary.json"
+    if not summary_file.exists():
+        print(f"Error: summary file not found: {summary_file}")
+        return
+
+    summary = load_summary(summary_file)
+    print(f"Loaded summary with {len(summary['results'])} k-values")
+
+    # Default output is one faceted figure per metric instead of 2 x K files.
+    results_by_k = {
+        r["k"]: load_result(str(input_dir / r["file"])) for r in summary["results"]
+    }
+    render_summary_plots(summary, results_by_k, plots_dir)
+
+    if args.per_k:
+        # Each k renders two independent figures; fan the CPU-bound
+        # Matplotlib work out across cores instead of rendering serially.
+        ks = [r["k"] for r in summary["results"]]
+        files = [str(input_dir / r["file"]) for r in summary["results"]]
+        initializer = _enable_usetex if args.publication else None
+        # Fork so workers inherit the warm matplotlib state (the module-level
+        # figure has already materialized the font manager); spawn would pay
+        # the full import + font-cache cost per worker.
+        ctx = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(
+            max_workers=os.cpu_count(), mp_context=ctx, initializer=initializer
+        ) as executor:
+            futures = {
+                executor.submit(_render_one, k, f, plots_dir): k
+                for k, f in zip(ks, files)
+            }
+            for future in as_completed(futures):
+                future.result()
+                print(f"Rendered per-k figures for k={futures[future]}")
+
+    plt.close(_FIG)
+
+    print("All plots generated successfully!")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,13 +8,19 @@ This script creates plots optimized for SOSP paper presentation:
 3. Speedup comparison showing improvement factor
 """
 
+import argparse
 import json
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Dict, List, Tuple
 
 import matplotlib.pyplot as plt  # type: ignore
 import numpy as np  # type: ignore
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # SOSP style configuration (inspired by reference image)
 SOSP_STYLE = {
@@ -38,15 +44,40 @@ SOSP_STYLE = {
     "savefig.dpi": 300,
     "savefig.bbox": "tight",
     "savefig.pad_inches": 0.1,
+    # LaTeX rendering forks a latex process per text element; keep it off
+    # for iteration and opt in via --usetex for final publication runs.
+    "text.usetex": False,
 }
 
+# Apply the style once at import; per-plot re-application re-parses the
+# stylesheet and invalidates font caches for no benefit.
+plt.style.use("default")
+plt.rcParams.update(SOSP_STYLE)
+
+
+# One row per run: structured layout so plotting can slice whole columns
+# instead of rebuilding Python lists per stage.
+RUN_DTYPE = np.dtype(
+    [
+        ("total", "f8"),      # total_time_seconds
+        ("analysis", "f8"),   # avg_analysis_ms
+        ("synthesis", "f8"),  # avg_synthesis_ms
+        ("summary", "f8"),    # avg_summary_ms
+    ]
+)
+
+
+def _fresh(src_mtime: float, dst: Path) -> bool:
+    """True when dst exists and is newer than every source JSON."""
+    return dst.exists() and dst.stat().st_mtime >= src_mtime
+
+
+def load_results(output_dir: Path) -> Dict[str, np.ndarray]:
+    """Load all JSON result files and group by mode into structured arrays.
 
-def load_results(output_dir: Path) -> Dict[str, List[Dict[str, Any]]]:
-    """Load all JSON result files and group by mode.
-    
     Excludes run 1 (warmup) and only includes runs 2-4 for error bar calculations.
     """
-    results: Dict[str, List[Dict[str, Any]]] = {
+    results: Dict[str, List[Tuple[float, float, float, float]]] = {
         "baseline": [],  # SGLang baseline
         "orla": [],      # Orla with SGLang
         "ollama_baseline": [],  # Ollama baseline
@@ -61,44 +92,51 @@ def load_results(output_dir: Path) -> Dict[str, List[Dict[str, Any]]]:
         if file.name.endswith("_1.json"):
             continue
             
-        with open(file, "r") as f:
-            data = json.load(f)
-            mode = data.get("mode", "")
-            
-            if mode == "baseline":
-                results["baseline"].append(data)
-            elif mode == "cascade":
-                results["orla"].append(data)
-            elif mode == "baseline-ollama":
-                results["ollama_baseline"].append(data)
-            elif mode == "cascade-ollama":
-                results["ollama"].append(data)
-    
-    return results
+        if orjson is not None:
+            data = orjson.loads(file.read_bytes())
+        else:
+            with open(file, "r") as f:
+                data = json.load(f)
+        mode = data.get("mode", "")
+        row = (
+            data["total_time_seconds"],
+            data["avg_analysis_ms"],
+            data["avg_synthesis_ms"],
+            data["avg_summary_ms"],
+        )
 
+        if mode == "baseline":
+            results["baseline"].append(row)
+        elif mode == "cascade":
+            results["orla"].append(row)
+        elif mode == "baseline-ollama":
+            results["ollama_baseline"].append(row)
+        elif mode == "cascade-ollama":
+            results["ollama"].append(row)
 
-def calculate_stats(values: List[float]) -> Tuple[float, float]:
+    return {mode: np.array(rows, dtype=RUN_DTYPE) for mode, rows in results.items()}
+
+
+def calculate_stats(values: np.ndarray) -> Tuple[float, float]:
     """Calculate mean and standard deviation (for error bars)."""
-    if not values:
+    n = len(values)
+    if n == 0:
         return 0.0, 0.0
-    if len(values) == 1:
-        # If only one value, use a small error to still show error bars
-        return values[0], values[0] * 0.01
-    mean = np.mean(values)
-    std = np.std(values, ddof=1)  # Sample standard deviation
+    arr = np.asarray(values, dtype=np.float64)  # no-op for load_results arrays
+    mean = float(arr.mean())
+    # With a single run, use a small synthetic error to still show error bars;
+    # otherwise sample standard deviation.
+    std = float(arr.std(ddof=1)) if n > 1 else mean * 0.01
     return mean, std
 
 
-def plot_bar_chart(results: Dict[str, List[Dict[str, Any]]], output_path: Path) -> None:
+def plot_bar_chart(results: Dict[str, np.ndarray], output_path: Path) -> None:
     """Create separate bar charts for datacenter and edge serving to handle scale differences."""
-    plt.style.use("default")
-    plt.rcParams.update(SOSP_STYLE)
-    
     # Extract total_time_seconds for each group
-    datacenter_baseline = [r["total_time_seconds"] for r in results["baseline"]]
-    datacenter_orla = [r["total_time_seconds"] for r in results["orla"]]
-    edge_baseline = [r["total_time_seconds"] for r in results["ollama_baseline"]]
-    edge_orla = [r["total_time_seconds"] for r in results["ollama"]]
+    datacenter_baseline = results["baseline"]["total"]
+    datacenter_orla = results["orla"]["total"]
+    edge_baseline = results["ollama_baseline"]["total"]
+    edge_orla = results["ollama"]["total"]
     
     # Calculate means and standard deviations
     dc_baseline_mean, dc_baseline_err = calculate_stats(datacenter_baseline)
@@ -116,7 +154,6 @@ def plot_bar_chart(results: Dict[str, List[Dict[str, Any]]], output_path: Path)
     
     # Create combined subplot version matching reference style
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(9, 4.5), sharey=False)
-    plt.rcParams.update(SOSP_STYLE)
     
     # Positions with spacing between bars (like reference)
     x_positions = np.array([0, 1, 2, 3])  # Four positions for spacing
@@ -185,13 +222,10 @@ def plot_bar_chart(results: Dict[str, List[Dict[str, Any]]], output_path: Path)
     plt.close()
 
 
-def plot_stage_breakdown(results: Dict[str, List[Dict[str, Any]]], output_path: Path, backend: str) -> None:
+def plot_stage_breakdown(results: Dict[str, np.ndarray], output_path: Path, backend: str) -> None:
     """Create grouped bar chart showing per-stage latency breakdown - KEY PLOT for SOSP."""
-    plt.style.use("default")
-    plt.rcParams.update(SOSP_STYLE)
-    
     fig, ax = plt.subplots(figsize=SOSP_STYLE["figure.figsize"])
-    
+
     if backend == "sglang":
         baseline_data = results["baseline"]
         orla_data = results["orla"]
@@ -203,14 +237,15 @@ def plot_stage_breakdown(results: Dict[str, List[Dict[str, Any]]], output_path:
         backend_label = "Ollama"
         output_name = "ollama_stage_breakdown"
     
-    # Extract per-stage times (convert ms to seconds)
-    baseline_analysis = [r["avg_analysis_ms"] / 1000.0 for r in baseline_data]
-    baseline_synthesis = [r["avg_synthesis_ms"] / 1000.0 for r in baseline_data]
-    baseline_summary = [r["avg_summary_ms"] / 1000.0 for r in baseline_data]
-    
-    orla_analysis = [r["avg_analysis_ms"] / 1000.0 for r in orla_data]
-    orla_synthesis = [r["avg_synthesis_ms"] / 1000.0 for r in orla_data]
-    orla_summary = [r["avg_summary_ms"] / 1000.0 for r in orla_data]
+    # Extract per-stage times (convert ms to seconds); column slices, no
+    # per-run Python loop
+    baseline_analysis = baseline_data["analysis"] / 1000.0
+    baseline_synthesis = baseline_data["synthesis"] / 1000.0
+    baseline_summary = baseline_data["summary"] / 1000.0
+
+    orla_analysis = orla_data["analysis"] / 1000.0
+    orla_synthesis = orla_data["synthesis"] / 1000.0
+    orla_summary = orla_data["summary"] / 1000.0
     
     # Calculate means and errors
     bl_analysis_mean, bl_analysis_err = calculate_stats(baseline_analysis)
@@ -281,18 +316,15 @@ def plot_stage_breakdown(results: Dict[str, List[Dict[str, Any]]], output_path:
     plt.close()
 
 
-def plot_speedup_comparison(results: Dict[str, List[Dict[str, Any]]], output_path: Path) -> None:
+def plot_speedup_comparison(results: Dict[str, np.ndarray], output_path: Path) -> None:
     """Create normalized speedup plot showing improvement factor."""
-    plt.style.use("default")
-    plt.rcParams.update(SOSP_STYLE)
-    
     fig, ax = plt.subplots(figsize=SOSP_STYLE["figure.figsize"])
-    
+
     # Calculate speedup (baseline / orla)
-    dc_baseline = [r["total_time_seconds"] for r in results["baseline"]]
-    dc_orla = [r["total_time_seconds"] for r in results["orla"]]
-    edge_baseline = [r["total_time_seconds"] for r in results["ollama_baseline"]]
-    edge_orla = [r["total_time_seconds"] for r in results["ollama"]]
+    dc_baseline = results["baseline"]["total"]
+    dc_orla = results["orla"]["total"]
+    edge_baseline = results["ollama_baseline"]["total"]
+    edge_orla = results["ollama"]["total"]
     
     dc_baseline_mean = np.mean(dc_baseline)
     dc_orla_mean = np.mean(dc_orla)
@@ -341,6 +373,21 @@ def plot_speedup_comparison(results: Dict[str, List[Dict[str, Any]]], output_pat
 
 def main() -> None:
     """Main function to generate all plots."""
+    parser = argparse.ArgumentParser(description="Cascade evaluation plots")
+    parser.add_argument(
+        "--usetex",
+        action="store_true",
+        help="Render text with LaTeX (slow; publication runs only)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate plots even when they are newer than the result JSON",
+    )
+    args = parser.parse_args()
+    if args.usetex:
+        plt.rcParams["text.usetex"] = True
+
     # Get paths
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
@@ -360,13 +407,27 @@ def main() -> None:
     for mode, data in results.items():
         print(f"  {mode}: {len(data)} runs")
     
+    # Skip plots whose outputs are already newer than every result file.
+    src_mtime = 0.0
+    if not args.force:
+        src_mtime = max(
+            (p.stat().st_mtime for p in output_dir.glob("*.json")), default=0.0
+        )
+
+    def stale(name: str) -> bool:
+        return args.force or not _fresh(src_mtime, plots_dir / f"{name}.pdf")
+
     # Generate plots
     print("\nGenerating SOSP-optimized plots...")
-    plot_bar_chart(results, plots_dir)
-    plot_stage_breakdown(results, plots_dir, "sglang")
-    plot_stage_breakdown(results, plots_dir, "ollama")
-    plot_speedup_comparison(results, plots_dir)
-    
+    if stale("end_to_end_comparison"):
+        plot_bar_chart(results, plots_dir)
+    if stale("sglang_stage_breakdown"):
+        plot_stage_breakdown(results, plots_dir, "sglang")
+    if stale("ollama_stage_breakdown"):
+        plot_stage_breakdown(results, plots_dir, "ollama")
+    if stale("speedup_comparison"):
+        plot_speedup_comparison(results, plots_dir)
+
     print("\nAll plots generated successfully!")
 
 
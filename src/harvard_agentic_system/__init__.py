@@ -0,0 +1,21 @@
+"""Python driver for the story finishing experiment against a vLLM backend.
+
+Mirrors the Go experiment in experiments/story_finishing, but talks to
+vLLM's OpenAI-compatible server directly and recovers TTFT/TPOT from the
+server-side Prometheus histograms.
+"""
+
+from .agent import Agent, AgentMetrics
+from .game import StoryFinishingGame
+from .metrics import MetricsDelta, MetricsManager, MetricsSnapshot
+from .server import VLLMServer
+
+__all__ = [
+    "Agent",
+    "AgentMetrics",
+    "MetricsDelta",
+    "MetricsManager",
+    "MetricsSnapshot",
+    "StoryFinishingGame",
+    "VLLMServer",
+]
@@ -0,0 +1,271 @@
+"""One player in the story finishing game.
+
+Each turn the agent asks the backend to continue the story by exactly `c`
+tokens and recovers server-side TTFT/TPOT for that request by diffing
+Prometheus snapshots taken before and after the call. The completion is
+streamed, so a client-side TTFT (first-chunk arrival) is measured along
+the way and stands in whenever the Prometheus delta comes back empty.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+
+import requests
+
+from .metrics import MetricsManager, validate_metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True, frozen=True)
+class AgentMetrics:
+    """Per-turn latency measurements for one agent turn (times in seconds).
+
+    slots drops the per-instance __dict__ (these accumulate one per turn)
+    and frozen documents that a recorded measurement never changes.
+    """
+
+    turn: int
+    agent_id: str
+    ttft: float
+    tpot: float
+    prefill_time: float
+    decode_time: float
+    generated_tokens: int
+    total_time: float
+
+
+class Agent:
+    """Story finishing agent backed by an OpenAI-compatible vLLM server."""
+
+    def __init__(
+        self,
+        agent_id: str,
+        client,
+        model_name: str,
+        c: int,
+        metrics_manager: MetricsManager,
+        server_url: str,
+        client_side_metrics: bool = False,
+    ):
+        self.agent_id = agent_id
+        self.client = client
+        self.model_name = model_name
+        self.c = c
+        self.metrics_manager = metrics_manager
+        self.server_url = server_url
+        # The Prometheus counters are global to the server, so snapshot
+        # deltas are only attributable to this agent's request when no
+        # other game talks to the same backend in between. When games
+        # overlap (concurrent sweeps, batched waves), the caller sets
+        # client_side_metrics and the streamed per-request timings become
+        # the metric source instead; prefill/decode split is unavailable
+        # in that mode and is reported as 0.
+        self.client_side_metrics = client_side_metrics
+        # Pooled session for the /tokenize fallback, bound once like the
+        # scraper's session: the endpoint is invariant over a game, so
+        # there is no reason to pay a fresh handshake per count.
+        self._session = requests.Session()
+        # c is fixed for the agent's lifetime, so the template half of the
+        # prompt is formatted once here instead of once per turn. Both
+        # agents format the same template with the same c, so the prefix
+        # is byte-identical across agents and turns; with the server's
+        # prefix caching on, turn N's prompt has turn N-1's prompt as an
+        # exact prefix regardless of which agent issued it, and prefill
+        # only covers the newly appended text.
+        self._prompt_prefix = (
+            f"We are playing a story finishing game. It is your turn. You are "
+            f"only allowed to give me the next {c} tokens. You must give me "
+            f"exactly the next {c} tokens to finish the story. The story "
+            f"starts as follows:\n\nOnce upon a time "
+        )
+
+    def _construct_prompt(self, context: str) -> str:
+        """Same prompt template as the Go story_finishing experiment.
+
+        This is the whole of client-side prompt preparation: one string
+        concatenation. The chat template and tokenization happen on the
+        server, so there is no CPU-side prep worth overlapping with the
+        previous turn's decode.
+        """
+        return self._prompt_prefix + context
+
+    def _count_tokens(self, text: str) -> int:
+        """Count tokens via the server's /tokenize endpoint."""
+        try:
+            response = self._session.post(
+                f"{self.server_url}/tokenize",
+                json={"model": self.model_name, "prompt": text},
+                timeout=10,
+            )
+            response.raise_for_status()
+            return int(response.json().get("count", 0))
+        except requests.exceptions.RequestException:
+            # Endpoint unavailable; fall back to a whitespace estimate.
+            return len(text.split())
+
+    def generate_turn(
+        self, turn: int, context: str, agent_id: str | None = None
+    ) -> tuple[str, AgentMetrics]:
+        """Generate the next `c` tokens and measure the request.
+
+        `agent_id` labels the recorded metrics for this turn; it defaults
+        to the instance's own id, so a single shared Agent can play both
+        sides of the game with per-side attribution intact.
+        """
+        label = agent_id if agent_id is not None else self.agent_id
+        prompt = self._construct_prompt(context)
+        metrics_before = None
+        if not self.client_side_metrics:
+            # The closing snapshot of the previous turn doubles as this
+            # turn's opening one (all agents share the manager), so only
+            # the game's first turn pays a dedicated opening scrape. This
+            # also means there is no per-turn scrape left to overlap with
+            # the generation request, which is why the client stays
+            # synchronous: the closing scrape cannot start until the
+            # request has finished, and the game itself is inherently
+            # sequential (each turn consumes the previous turn's text).
+            metrics_before = self.metrics_manager.last_snapshot
+            if metrics_before is None:
+                metrics_before = self.metrics_manager.get_snapshot()
+
+        # Stream the completion so the first-chunk arrival gives a real
+        # client-side TTFT. The Prometheus delta below stays the primary
+        # metric source (it is the only source of prefill/decode times);
+        # the streamed timing replaces the old total_time fallback, which
+        # overstated TTFT by the entire decode whenever the scrape raced
+        # the counter flush.
+        # perf_counter, not time.time: the TTFT samples are milliseconds,
+        # so NTP slew on CLOCK_REALTIME would be indistinguishable from
+        # real latency jitter in the percentiles.
+        start = time.perf_counter()
+        stream = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=self.c,
+            temperature=0.7,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        first_chunk_time = None
+        parts: list[str] = []
+        usage = None
+        for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                if first_chunk_time is None:
+                    first_chunk_time = time.perf_counter()
+                parts.append(chunk.choices[0].delta.content)
+        total_time = time.perf_counter() - start
+        if not parts:
+            raise RuntimeError("completion stream produced no content")
+        generated_text = "".join(parts)
+        client_ttft = (
+            first_chunk_time - start if first_chunk_time is not None else total_time
+        )
+
+        # The server already counted the output tokens for the stream's
+        # usage chunk; asking /tokenize to re-tokenize the text would cost
+        # an extra HTTP round-trip per turn for the same number. The
+        # usage chunk is the one optional field worth paying for: it is a
+        # single terminal SSE event, while everything else (logprobs etc.)
+        # stays at its default of off so chunks carry only the delta text.
+        if usage is not None and usage.completion_tokens is not None:
+            generated_tokens = usage.completion_tokens
+        else:
+            generated_tokens = self._count_tokens(generated_text)
+
+        if self.client_side_metrics:
+            # Another game's requests land in the same global counters, so
+            # a snapshot delta would blend this turn with whatever else
+            # the server processed in the window. The streamed timings are
+            # per-request by construction and stay clean under overlap.
+            ttft = client_ttft
+            if generated_tokens > 1:
+                tpot = (total_time - client_ttft) / (generated_tokens - 1)
+            else:
+                tpot = 0.0
+            prefill_time = 0.0
+            decode_time = 0.0
+        else:
+            # Poll until the request shows up in the Prometheus counters
+            # rather than sleeping a fixed 100 ms; the counters usually
+            # flush within a few milliseconds, and the deadline bounds the
+            # wait when a scrape fails. A scrape can fail transiently
+            # (get_snapshot returns None); failed polls are skipped rather
+            # than stored, so last_snapshot is never poisoned with a
+            # fabricated zero reading.
+            metrics_after = None
+            if metrics_before is not None:
+                deadline = time.monotonic() + 0.5
+                while True:
+                    snapshot = self.metrics_manager.get_snapshot()
+                    if snapshot is not None:
+                        metrics_after = snapshot
+                        if metrics_after.request_count > metrics_before.request_count:
+                            break
+                    if time.monotonic() >= deadline:
+                        break
+                    time.sleep(0.005)
+            if metrics_before is None or metrics_after is None:
+                # No usable snapshot pair for this turn (the opening or
+                # closing scrape failed). Keep the previous last_snapshot
+                # so the next turn still has a valid baseline, and record
+                # this turn from the streamed client-side timings.
+                logger.warning(
+                    "metrics scrape unavailable for %s turn %d; "
+                    "using client-side timings",
+                    label,
+                    turn,
+                )
+                ttft = client_ttft
+                if generated_tokens > 1:
+                    tpot = (total_time - client_ttft) / (generated_tokens - 1)
+                else:
+                    tpot = 0.0
+                prefill_time = 0.0
+                decode_time = 0.0
+            else:
+                self.metrics_manager.last_snapshot = metrics_after
+                validate_metrics(metrics_before, metrics_after)
+                delta = metrics_after.delta(metrics_before)
+
+                ttft = delta.get_ttft()
+                tpot = delta.get_tpot()
+                if ttft == 0.0:
+                    # The scrape can race the counter flush; fall back to
+                    # the streamed client-side timings so the turn is not
+                    # recorded as free.
+                    ttft = client_ttft
+                    if tpot == 0.0 and generated_tokens > 1:
+                        tpot = (total_time - client_ttft) / (generated_tokens - 1)
+                prefill_time = delta.get_prefill_time()
+                decode_time = delta.get_decode_time()
+
+        # %-style keeps the float formatting and text slicing lazy: with
+        # the log level above INFO neither runs at all.
+        logger.info(
+            "%s turn %d: %d tokens, ttft=%.1fms, tpot=%.2fms",
+            label,
+            turn,
+            generated_tokens,
+            ttft * 1000,
+            tpot * 1000,
+        )
+        logger.info("Generated text: %.100s...", generated_text)
+
+        metrics = AgentMetrics(
+            turn=turn,
+            agent_id=label,
+            ttft=ttft,
+            tpot=tpot,
+            prefill_time=prefill_time,
+            decode_time=decode_time,
+            generated_tokens=generated_tokens,
+            total_time=total_time,
+        )
+        return generated_text, metrics
@@ -0,0 +1,235 @@
+"""Story finishing game: two agents alternate turns, each adding c tokens.
+
+Python counterpart of experiments/story_finishing/main.go, talking directly
+to a vLLM OpenAI-compatible server instead of going through Orla.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+import httpx
+import numpy as np
+from openai import OpenAI
+
+from .agent import Agent, AgentMetrics
+from .metrics import MetricsManager
+from .server import VLLMServer
+
+logger = logging.getLogger(__name__)
+
+# Turn ownership, indexed by turn & 1: odd turns belong to agent_i, even
+# turns to agent_j. One tuple lookup per turn instead of a modulo branch.
+_TURN_OWNERS = ("agent_j", "agent_i")
+
+
+class StoryFinishingGame:
+    """Two agents alternate turns; each turn adds c tokens to the story.
+
+    Turns within one game cannot be batched: every turn's prompt contains
+    the previous turn's output. Note that k here is the token budget per
+    turn (k = c), not a request fanout — each turn is exactly one
+    completion request, so there is no intra-turn concurrency to exploit.
+    Batching happens across games instead — experiments/run_experiments.py
+    --batched advances all k-games in lockstep via step(), one request
+    wave per turn, driven from its event loop.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        num_turns: int,
+        c: int,
+        backend_url: str = "http://localhost:8000/v1",
+        start_server: bool = False,
+        server_args: list[str] | None = None,
+        client_side_metrics: bool = False,
+    ):
+        self.model_name = model_name
+        self.num_turns = num_turns
+        self.c = c
+        self.backend_url = backend_url
+        self.start_server = start_server
+        self.server_args = server_args
+        # When several games share one backend, the server's Prometheus
+        # counters mix their requests; this makes the agent measure each
+        # turn from its own streamed response instead (see Agent).
+        self.client_side_metrics = client_side_metrics
+        self.server: VLLMServer | None = None
+        self.client = None
+        self._http_client: httpx.Client | None = None
+        self.agent: Agent | None = None
+        self.metrics_manager: MetricsManager | None = None
+        # The story accumulates as a list of per-turn parts, joined on
+        # demand: str += rebuilds the whole string every turn (O(T^2)
+        # bytes copied over a game), append is O(1). The leading empty
+        # part reproduces the separator-first layout the += version
+        # produced, so prompts are byte-identical.
+        #
+        # The context stays a string rather than client-side token IDs:
+        # the agents use the chat endpoint, whose chat template is applied
+        # (and tokenized) server-side, so pre-tokenized prompts would
+        # bypass the template and change what the model sees. Server-side
+        # re-tokenization of the shared prefix is the cheap part; the
+        # re-prefill it used to imply is what prefix caching removes.
+        self._context_parts: list[str] = [""]
+        self._context_len = 0
+        self.all_metrics: list[AgentMetrics] = []
+        # ttft/tpot are collected as each turn lands, so aggregate() can
+        # build its arrays straight from flat float lists instead of
+        # re-walking the dataclass list with per-element attribute loads.
+        self._ttft_vals: list[float] = []
+        self._tpot_vals: list[float] = []
+
+    @property
+    def context(self) -> str:
+        """The story so far, joined from the per-turn parts."""
+        return " ".join(self._context_parts)
+
+    def start(self) -> None:
+        """Bring up the server (optionally), the client, and both agents."""
+        if self.start_server:
+            self.server = VLLMServer(self.model_name, extra_args=self.server_args)
+            self.server.start()
+
+        # Strip the OpenAI path suffix to reach server-level endpoints
+        # (/metrics, /tokenize, /health).
+        server_url = self.backend_url.rsplit("/v1", 1)[0]
+        # Explicit pooled transport, same reasoning as the sessions in
+        # MetricsManager and Agent: one game issues hundreds of sequential
+        # requests to the same host, so keep the connection alive for the
+        # whole game instead of letting the default 5s keep-alive expiry
+        # drop it between slow turns. The timeout covers a full c-token
+        # generation against a loaded server.
+        self._http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_keepalive_connections=4,
+                max_connections=8,
+                keepalive_expiry=300.0,
+            ),
+            timeout=httpx.Timeout(600.0),
+        )
+        self.client = OpenAI(
+            base_url=self.backend_url, api_key="dummy", http_client=self._http_client
+        )
+        self.metrics_manager = MetricsManager(f"{server_url}/metrics")
+        # The two sides of the game differ only in the label recorded on
+        # their metrics — same client, same prompt template, same c — so
+        # one Agent plays both, with the owner passed per turn. Sharing
+        # the instance also makes it explicit that both sides hit the
+        # same prefix-cache entries.
+        self.agent = Agent(
+            "shared",
+            self.client,
+            self.model_name,
+            self.c,
+            self.metrics_manager,
+            server_url,
+            client_side_metrics=self.client_side_metrics,
+        )
+        self._warmup()
+
+    def _warmup(self) -> None:
+        """Pay the server's cold-start costs before the measured window.
+
+        The first request after server start absorbs CUDA graph capture
+        and cold caches and can be several times slower than steady
+        state; a second identical request warms the decode path too.
+        Doing this here means every turn of run() is steady state and
+        warmup time never lands inside the game_start/game_end interval.
+        """
+        for _ in range(2):
+            self.client.chat.completions.create(
+                model=self.model_name,
+                messages=[{"role": "user", "content": "warmup"}],
+                max_tokens=self.c,
+                temperature=0.7,
+            )
+
+    def stop(self) -> None:
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
+
+    def __enter__(self) -> "StoryFinishingGame":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def step(self, turn: int) -> AgentMetrics:
+        """Play a single turn: the turn's agent extends the story by c tokens."""
+        agent_name = _TURN_OWNERS[turn & 1]
+        # %-style so the formatting only runs if INFO is actually enabled.
+        logger.info(
+            "Turn %d/%d: %s (context: %d chars)",
+            turn,
+            self.num_turns,
+            agent_name,
+            self._context_len,
+        )
+        generated_text, metrics = self.agent.generate_turn(turn, self.context, agent_name)
+        self._context_parts.append(generated_text)
+        self._context_len += len(generated_text) + 1
+        self.all_metrics.append(metrics)
+        self._ttft_vals.append(metrics.ttft)
+        self._tpot_vals.append(metrics.tpot)
+        return metrics
+
+    def run(self) -> dict:
+        """Play the game and return aggregate plus per-turn metrics."""
+        # perf_counter: monotonic and high-resolution, immune to the NTP
+        # slew/jumps that CLOCK_REALTIME (time.time) is subject to.
+        game_start = time.perf_counter()
+        for turn in range(1, self.num_turns + 1):
+            self.step(turn)
+        game_end = time.perf_counter()
+        return self.aggregate(game_start, game_end)
+
+    def aggregate(self, game_start: float, game_end: float) -> dict:
+        """Summarize the collected per-turn metrics into the results dict."""
+        # start() already warmed the server outside the measured window,
+        # so turn 1 is steady state and every recorded turn counts.
+        #
+        # step() pushed each turn's ttft/tpot into flat float lists as it
+        # landed, so the arrays come straight from those buffers; the mean
+        # and both percentiles then run in compiled code. np.percentile
+        # computes p50 and p99 in a single partial-sort pass, so no full
+        # sort is needed.
+        ttft_values = np.asarray(self._ttft_vals, dtype=np.float64)
+        tpot_values = np.asarray(self._tpot_vals, dtype=np.float64)
+        avg_ttft = float(ttft_values.mean())
+        avg_tpot = float(tpot_values.mean())
+        ttft_p50, ttft_p99 = np.percentile(ttft_values, (50, 99))
+        tpot_p50, tpot_p99 = np.percentile(tpot_values, (50, 99))
+
+        return {
+            "total_time": game_end - game_start,
+            "num_turns": self.num_turns,
+            "k": self.c,
+            "avg_ttft": avg_ttft,
+            "ttft_p50": float(ttft_p50),
+            "ttft_p99": float(ttft_p99),
+            "avg_tpot": avg_tpot,
+            "tpot_p50": float(tpot_p50),
+            "tpot_p99": float(tpot_p99),
+            "story_length_chars": self._context_len,
+            "per_turn_metrics": [
+                {
+                    "turn": m.turn,
+                    "agent_id": m.agent_id,
+                    "ttft": m.ttft,
+                    "tpot": m.tpot,
+                    "prefill_time": m.prefill_time,
+                    "decode_time": m.decode_time,
+                    "generated_tokens": m.generated_tokens,
+                    "total_time": m.total_time,
+                }
+                for m in self.all_metrics
+            ],
+        }
@@ -0,0 +1,125 @@
+"""vLLM server lifecycle management for the Python story finishing driver."""
+
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import tempfile
+import time
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class VLLMServer:
+    """Starts and stops a local `vllm serve` process."""
+
+    def __init__(self, model_name: str, port: int = 8000, extra_args: list[str] | None = None):
+        self.model_name = model_name
+        self.port = port
+        self.extra_args = list(extra_args or [])
+        self.base_url = f"http://localhost:{port}"
+        self.process: subprocess.Popen | None = None
+        self._stderr_file = None
+        # Pooled session for the /health polls: the readiness loop can
+        # probe the endpoint many times during startup, and a bare
+        # requests.get opens and tears down a connection per probe.
+        self._session = requests.Session()
+
+    def start(self, timeout: float = 300.0) -> None:
+        """Launch the server and block until its /health endpoint answers."""
+        # Prefix caching reuses KV blocks for the shared story prefix, so
+        # each turn's prefill covers only the newly appended text instead
+        # of re-prefilling the whole accumulated context (O(T^2) prefill
+        # tokens over a game). The prompt template is byte-stable across
+        # turns, so every turn after the first hits the cache.
+        # The driver only ever has a handful of requests in flight (one
+        # per game, a few games under the batched sweep), so vLLM's
+        # default --max-num-seqs of 256 reserves KV cache blocks for
+        # parallel sequences that never exist. Sizing it down hands those
+        # blocks to the single long growing context, and the slightly
+        # lower GPU memory utilization leaves headroom for allocator
+        # growth instead of risking fragmentation ooms mid-game.
+        # extra_args comes last and wins if a caller overrides any of this.
+        cmd = [
+            "vllm",
+            "serve",
+            self.model_name,
+            "--port",
+            str(self.port),
+            "--enable-prefix-caching",
+            "--max-num-seqs",
+            "8",
+            "--gpu-memory-utilization",
+            "0.85",
+            *self.extra_args,
+        ]
+        logger.info("Starting vLLM server: %s", " ".join(cmd))
+        # vLLM logs heavily during warmup; with stdout=PIPE and nobody
+        # draining it, the ~64KB pipe buffer fills and blocks the server's
+        # logging thread mid-startup. Discard stdout and spill stderr to
+        # an unlinked temp file, which is only read back (tail only) if
+        # startup fails.
+        self._stderr_file = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            cmd, stdout=subprocess.DEVNULL, stderr=self._stderr_file
+        )
+
+        # Exponential backoff on the readiness probe: a fixed 2s sleep
+        # means ~1s of average dead time after the server actually comes
+        # up, which dominates harness restart overhead across repeated
+        # runs. Start at 50ms and back off toward 2s while the server is
+        # still loading weights.
+        start_time = time.time()
+        delay = 0.05
+        while time.time() - start_time < timeout:
+            if self.process.poll() is not None:
+                raise RuntimeError(
+                    f"vLLM server exited during startup:\n{self._stderr_tail()}"
+                )
+            try:
+                response = self._session.get(f"{self.base_url}/health", timeout=0.5)
+                if response.status_code == 200:
+                    logger.info("vLLM server ready after %.1fs", time.time() - start_time)
+                    return
+            except requests.exceptions.RequestException:
+                pass
+            time.sleep(delay)
+            delay = min(delay * 1.5, 2.0)
+
+        self.stop()
+        raise TimeoutError(f"vLLM server did not become ready within {timeout:.0f}s")
+
+    def _stderr_tail(self, limit: int = 2000) -> str:
+        """Last `limit` bytes of the server's stderr spill file."""
+        if self._stderr_file is None:
+            return ""
+        self._stderr_file.seek(0, os.SEEK_END)
+        size = self._stderr_file.tell()
+        self._stderr_file.seek(max(0, size - limit))
+        return self._stderr_file.read().decode(errors="replace")
+
+    def is_running(self) -> bool:
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            return self._session.get(f"{self.base_url}/health", timeout=1).status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    def stop(self) -> None:
+        if self.process is None:
+            return
+        logger.info("Stopping vLLM server")
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+        if self._stderr_file is not None:
+            self._stderr_file.close()
+            self._stderr_file = None